@@ -1,22 +1,122 @@
 import os
+import time
+import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from curl_cffi import requests
+from tqdm import tqdm
 import json
 
+from .tracker import _compile_ignore_rules, hash_text
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _progress_bar(total, desc):
+    # Throttle redraws: with bursts of completing futures, tqdm's default
+    # mininterval repaints on every file.
+    return tqdm(total=total, desc=desc, unit="file", mininterval=0.5,
+                miniters=max(1, total // 200), smoothing=0.1, leave=True)
+
+
+def _decode_text(raw):
+    """Decode file bytes; returns None for binary content (NUL byte in the
+    first 4 KiB) that slipped past the extension filter."""
+    if b'\x00' in raw[:4096]:
+        return None
+    return raw.decode('utf-8', errors='ignore')
+
+
+def _read_text(file_path):
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    return _decode_text(raw)
+
+
+def _json_bytes(payload):
+    # orjson serializes string-heavy payloads several times faster than
+    # stdlib json and emits UTF-8 bytes directly; the fallback encodes with
+    # ensure_ascii=False to at least skip the \uXXXX escaping pass.
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+
+class RateLimitHandler:
+    """Retries a callable with decorrelated-jitter backoff so concurrent
+    workers hitting a 429 wall don't re-fire in lockstep."""
+
+    RETRYABLE_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+    def __init__(self, max_retries=5, initial_wait=1.0, max_delay=30.0):
+        self.max_retries = max_retries
+        self.initial_wait = initial_wait
+        self.max_delay = max_delay
+
+    def is_retryable(self, e):
+        status_code = getattr(getattr(e, 'response', None), 'status_code', None)
+        if status_code is not None:
+            return status_code in self.RETRYABLE_STATUSES
+        return isinstance(e, (requests.exceptions.ConnectionError,
+                              requests.exceptions.Timeout))
+
+    def execute_with_retry(self, func, *args, **kwargs):
+        wait_time = self.initial_wait
+        for attempt in range(self.max_retries):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                # Only rate limits, server errors and transport hiccups can
+                # self-resolve; auth/validation errors fail immediately.
+                # KeyboardInterrupt is a BaseException and passes through.
+                if not self.is_retryable(e) or attempt == self.max_retries - 1:
+                    raise
+                sleep_for = random.uniform(self.initial_wait, wait_time * 3)
+                retry_after = getattr(getattr(e, 'response', None), 'headers', {}).get('Retry-After')
+                if retry_after:
+                    try:
+                        sleep_for = max(sleep_for, float(retry_after))
+                    except ValueError:
+                        # Retry-After may also be an HTTP-date (RFC 9110);
+                        # just keep the jittered delay in that case.
+                        pass
+                sleep_for = min(sleep_for, self.max_delay)
+                print(f"Request failed ({e}), retrying in {sleep_for:.1f}s "
+                      f"({attempt + 1}/{self.max_retries})")
+                time.sleep(sleep_for)
+                wait_time = sleep_for
+
 
 class ClaudeAPI:
     BASE_URL = "https://claude.ai/api"
     USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36'
+    BULK_CHUNK_SIZE = 50
 
-    def __init__(self, session_key):
+    def __init__(self, session_key, upload_concurrency=6):
         self.session_key = session_key
         self.cookie = f"sessionKey={session_key}"
+        self.upload_concurrency = upload_concurrency
+        self._bulk_supported = None
+        self._remote_file_cache = {}
+        self.last_structure_hash = None
+        self.session = requests.Session(impersonate="chrome110")
+        self.session.headers.update(self._get_headers())
+        self.rate_limiter = RateLimitHandler()
         self.organization_id = self._get_organization_id()
 
+    def _do_request(self, method, url, **kwargs):
+        response = getattr(self.session, method)(url, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def _request(self, method, url, **kwargs):
+        return self.rate_limiter.execute_with_retry(self._do_request, method, url, **kwargs)
+
     def _get_organization_id(self):
         url = f"{self.BASE_URL}/organizations"
-        headers = self._get_headers()
-        response = requests.get(url, headers=headers, impersonate="chrome110")
-        response.raise_for_status()
+        response = self._request('get', url)
         organizations = response.json()
 
         for org in organizations:
@@ -45,31 +145,32 @@ class ClaudeAPI:
             "is_private": is_private,
             "description": description,
         }
-        response = requests.post(
-            url,
-            headers=self._get_headers(),
-            data=json.dumps(payload),
-            impersonate="chrome110",
-        )
-        if response.status_code != 201:
-            print(f"Request failed: {response.status_code}, {response.text}")
-        response.raise_for_status()
+        response = self._request('post', url, data=_json_bytes(payload))
         return response.json()
 
     def list_files_in_project(self, project_uuid):
         url = f"{self.BASE_URL}/organizations/{self.organization_id}/projects/{project_uuid}/docs"
-        response = requests.get(url, headers=self._get_headers(), impersonate="chrome110")
-        if response.status_code != 200:
-            print(f"Request failed: {response.status_code}, {response.text}")
-        response.raise_for_status()
+        response = self._request('get', url)
         return response.json()
 
+    def _get_remote_map(self, project_uuid):
+        """file_name -> uuid for the project's docs, listed at most once per
+        ClaudeAPI instance and kept current by add/delete/update calls."""
+        remote_map = self._remote_file_cache.get(project_uuid)
+        if remote_map is None:
+            remote_map = {f['file_name']: f['uuid']
+                          for f in self.list_files_in_project(project_uuid)}
+            self._remote_file_cache[project_uuid] = remote_map
+        return remote_map
+
     def delete_file_from_project(self, project_uuid, file_uuid):
         url = f"{self.BASE_URL}/organizations/{self.organization_id}/projects/{project_uuid}/docs/{file_uuid}"
-        response = requests.delete(url, headers=self._get_headers(), impersonate="chrome110")
-        if response.status_code != 204:
-            print(f"Failed to delete file {file_uuid}: {response.status_code}, {response.text}")
-        response.raise_for_status()
+        self._request('delete', url)
+        remote_map = self._remote_file_cache.get(project_uuid)
+        if remote_map:
+            for file_name, cached_uuid in list(remote_map.items()):
+                if cached_uuid == file_uuid:
+                    del remote_map[file_name]
         print(f"Deleted file {file_uuid}")
 
     def add_file_to_project(self, project_uuid, file_name, content):
@@ -78,62 +179,300 @@ class ClaudeAPI:
             "file_name": file_name,
             "content": content,
         }
-        response = requests.post(
-            url,
-            headers=self._get_headers(),
-            data=json.dumps(payload),
-            impersonate="chrome110",
-        )
-        if response.status_code != 201:
-            print(f"Request failed: {response.status_code}, {response.text}")
-        response.raise_for_status()
-        return response.json()
+        response = self._request('post', url, data=_json_bytes(payload))
+        result = response.json()
+        remote_map = self._remote_file_cache.get(project_uuid)
+        if remote_map is not None:
+            remote_map[file_name] = result.get('uuid')
+        return result
 
-    def generate_file_structure(self, directory_path, exclude_folders, exclude_extensions, exclude_name_includes):
+    def _collect_project_tree(self, directory_path, exclude_folders, exclude_extensions, exclude_name_includes):
+        """Walk the project once, producing both the indented structure lines
+        and the (file_path, relative_path) upload list."""
+        folder_set, ext_tuple, name_pattern = _compile_ignore_rules(
+            exclude_folders, exclude_extensions, exclude_name_includes)
         structure = []
-        for root, dirs, files in os.walk(directory_path):
-            dirs[:] = [d for d in dirs if d not in exclude_folders]
+        files = []
 
-            level = root.replace(directory_path, '').count(os.sep)
+        def _walk(dir_path, level, rel_prefix):
+            try:
+                with os.scandir(dir_path) as entries:
+                    entries = list(entries)
+            except OSError:
+                # Unreadable or vanished directory: skip it, matching
+                # os.walk's default onerror=None behaviour.
+                return
             indent = ' ' * 4 * level
-            structure.append(f"{indent}{os.path.basename(root)}/")
+            structure.append(f"{indent}{os.path.basename(dir_path)}/")
             subindent = ' ' * 4 * (level + 1)
-            for file in files:
-                if not any(file.endswith(ext) for ext in exclude_extensions) and \
-                        not any(substring in file for substring in exclude_name_includes):
-                    structure.append(f"{subindent}{file}")
+            subdirs = []
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in folder_set:
+                            subdirs.append((entry.path, entry.name))
+                    elif entry.is_file(follow_symlinks=False):
+                        name = entry.name
+                        if ext_tuple and name.endswith(ext_tuple):
+                            continue
+                        if name_pattern and name_pattern.search(name):
+                            continue
+                        structure.append(f"{subindent}{name}")
+                        # The walk descends from directory_path, so the
+                        # relative path is just the accumulated prefix.
+                        files.append((entry.path, rel_prefix + name))
+                except OSError:
+                    continue
+            for subdir_path, subdir_name in subdirs:
+                _walk(subdir_path, level + 1, rel_prefix + subdir_name + os.sep)
+
+        _walk(directory_path, 0, '')
+        return structure, files
+
+    def generate_file_structure(self, directory_path, exclude_folders, exclude_extensions, exclude_name_includes):
+        structure, _ = self._collect_project_tree(directory_path, exclude_folders,
+                                                  exclude_extensions, exclude_name_includes)
         return "\n".join(structure)
 
-    def upload_directory_with_structure(self, project_uuid, directory_path, config_manager):
+    def add_files_to_project_bulk(self, project_uuid, items):
+        """Upload several (file_name, content) pairs in one request when the
+        backend accepts an array payload, falling back to per-file POSTs."""
+        if self._bulk_supported is not False and len(items) > 1:
+            url = f"{self.BASE_URL}/organizations/{self.organization_id}/projects/{project_uuid}/docs"
+            payload = [{"file_name": file_name, "content": content} for file_name, content in items]
+            try:
+                response = self._request('post', url, data=_json_bytes(payload))
+            except Exception as e:
+                status_code = getattr(getattr(e, 'response', None), 'status_code', None)
+                if (status_code is None or not 400 <= status_code < 500
+                        or status_code in self.rate_limiter.RETRYABLE_STATUSES):
+                    # Transient failure (already retried by _request) or a
+                    # transport error: don't latch the capability off.
+                    raise
+                # A non-retryable 4xx means the endpoint rejects array
+                # payloads; remember that and use per-file POSTs from now on.
+                self._bulk_supported = False
+            else:
+                results = response.json()
+                if isinstance(results, list) and len(results) == len(items):
+                    self._bulk_supported = True
+                    remote_map = self._remote_file_cache.get(project_uuid)
+                    if remote_map is not None:
+                        # Keep the cached listing current, as the per-file
+                        # add/delete/update calls do.
+                        for result in results:
+                            if isinstance(result, dict) and 'file_name' in result:
+                                remote_map[result['file_name']] = result.get('uuid')
+                    return results
+                # A 2xx without one doc per item means the endpoint took the
+                # array payload but didn't bulk-create; trusting it would
+                # record files as uploaded that never were.
+                self._bulk_supported = False
+
+        return [self.add_file_to_project(project_uuid, file_name, content)
+                for file_name, content in items]
+
+    def delete_files_bulk(self, project_uuid, file_uuids):
+        """Delete several docs, one request each (no bulk endpoint is known
+        for deletes); kept as a single entry point so callers can chunk."""
+        for file_uuid in file_uuids:
+            self.delete_file_from_project(project_uuid, file_uuid)
+
+    def _upload_chunk(self, project_uuid, chunk):
+        items = []
+        skipped = []
+        for file_path, relative_path in chunk:
+            content = _read_text(file_path)
+            if content is None:
+                skipped.append(relative_path)
+            else:
+                items.append((relative_path, content))
+        self.add_files_to_project_bulk(project_uuid, items)
+        return [relative_path for relative_path, _ in items], skipped
+
+    def upload_directory_with_structure(self, project_uuid, directory_path, config_manager,
+                                        files_to_upload=None):
         ignore_folders, ignore_extensions, ignore_name_includes = config_manager.load_ignore_rules()
 
-        structure_content = self.generate_file_structure(directory_path, ignore_folders, ignore_extensions,
-                                                         ignore_name_includes)
+        if files_to_upload is None:
+            structure, files_to_upload = self._collect_project_tree(
+                directory_path, ignore_folders, ignore_extensions, ignore_name_includes)
+            structure_content = "\n".join(structure)
+        else:
+            # Caller already enumerated the files (e.g. from a tracker scan);
+            # walk only for the structure text.
+            structure_content = self.generate_file_structure(
+                directory_path, ignore_folders, ignore_extensions, ignore_name_includes)
         self.add_file_to_project(project_uuid, "PROJECT_STRUCTURE.txt", structure_content)
+        self.last_structure_hash = hash_text(structure_content)
         print("Uploaded PROJECT_STRUCTURE.txt")
 
-        for root, dirs, files in os.walk(directory_path):
-            dirs[:] = [d for d in dirs if d not in ignore_folders]
+        chunks = [files_to_upload[i:i + self.BULK_CHUNK_SIZE]
+                  for i in range(0, len(files_to_upload), self.BULK_CHUNK_SIZE)]
+        with ThreadPoolExecutor(max_workers=self.upload_concurrency) as executor:
+            futures = {
+                executor.submit(self._upload_chunk, project_uuid, chunk): chunk
+                for chunk in chunks
+            }
+            verbose = len(files_to_upload) <= 200
+            failed = []
+            with _progress_bar(len(files_to_upload), "Uploading files") as pbar:
+                for future in as_completed(futures):
+                    chunk = futures[future]
+                    try:
+                        uploaded, skipped = future.result()
+                        if verbose:
+                            for relative_path in uploaded:
+                                pbar.write(f"Uploaded {relative_path}")
+                        for relative_path in skipped:
+                            pbar.write(f"Skipped binary file {relative_path}")
+                    except Exception as e:
+                        pbar.write(f"Failed to upload chunk of {len(chunk)} files: {e}")
+                        failed.extend(relative_path for _, relative_path in chunk)
+                    pbar.update(len(chunk))
+        # Callers writing a manifest must drop these paths first, so the
+        # next update retries them instead of considering them synced.
+        return failed
+
+    def update_file_in_project(self, project_uuid, file_name, content, remote_map=None):
+        """Replace one doc. remote_map is {file_name: uuid} from a prior
+        list_files_in_project call; without it a fresh listing is fetched."""
+        if remote_map is None:
+            remote_map = self._get_remote_map(project_uuid)
+        file_uuid = remote_map.get(file_name)
+        if file_uuid:
+            self.delete_file_from_project(project_uuid, file_uuid)
+        response = self.add_file_to_project(project_uuid, file_name, content)
+        remote_map[file_name] = response.get('uuid')
+        return response
 
-            for file in files:
-                if not any(file.endswith(ext) for ext in ignore_extensions) and \
-                        not any(substring in file for substring in ignore_name_includes):
-                    file_path = os.path.join(root, file)
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()
-                        relative_path = os.path.relpath(file_path, directory_path)
-                        print(f"Uploading {relative_path}...")
-                        response = self.add_file_to_project(project_uuid, relative_path, content)
-                        print(f"Uploaded {relative_path}: {response}")
+    def _update_one(self, project_uuid, file_path, relative_path, remote_map, raw=None):
+        content = _decode_text(raw) if raw is not None else _read_text(file_path)
+        if content is None:
+            return None
+        self.update_file_in_project(project_uuid, relative_path, content, remote_map)
+        return relative_path
 
-    def reinitialize_project_files(self, project_uuid, directory_path, exclude_extensions=None):
-        if exclude_extensions is None:
-            exclude_extensions = []
+    def incremental_update_project(self, project_uuid, directory_path, config_manager, tracker):
+        """Sync only the files that changed since the last recorded manifest.
 
+        The remote doc listing is fetched exactly once and shared (as a
+        file_name -> uuid map) across deletions, updates and the structure
+        refresh, instead of re-listing per modified file."""
+        ignore_rules = config_manager.load_ignore_rules()
+        current_files = tracker.scan_directory(directory_path, *ignore_rules, keep_contents=True)
+        changes = tracker.get_changes(current_files)
+
+        if not any(changes.values()):
+            # Still record the scan: files whose mtime moved without a
+            # content change would otherwise miss the (size, mtime) gate and
+            # be re-hashed on every run. update_manifest skips the disk
+            # write when nothing actually changed.
+            tracker.update_manifest(current_files, tracker.manifest.get('structure_hash'))
+            print("No changes since last sync.")
+            return changes
+
+        remote_map = self._get_remote_map(project_uuid)
+
+        to_delete = [remote_map.pop(relative_path) for relative_path in changes['deleted']
+                     if relative_path in remote_map]
+
+        # New files go through the bulk add path in chunks; files with a
+        # remote counterpart need the per-file delete+add replace cycle.
+        content_cache = tracker.last_scan_contents
+        to_replace = []
+        add_items = []
+        for relative_path in changes['added'] + changes['modified']:
+            file_path = os.path.join(directory_path, relative_path)
+            if relative_path in remote_map:
+                to_replace.append((file_path, relative_path))
+            else:
+                raw = content_cache.get(relative_path)
+                content = _decode_text(raw) if raw is not None else _read_text(file_path)
+                if content is None:
+                    print(f"Skipped binary file {relative_path}")
+                else:
+                    add_items.append((relative_path, content))
+
+        with ThreadPoolExecutor(max_workers=self.upload_concurrency) as executor:
+            delete_futures = [
+                executor.submit(self.delete_files_bulk, project_uuid, to_delete[i:i + self.BULK_CHUNK_SIZE])
+                for i in range(0, len(to_delete), self.BULK_CHUNK_SIZE)
+            ]
+            for future in as_completed(delete_futures):
+                future.result()
+
+            futures = {
+                executor.submit(self._update_one, project_uuid, file_path, relative_path,
+                                remote_map, content_cache.get(relative_path)): relative_path
+                for file_path, relative_path in to_replace
+            }
+            add_futures = {
+                executor.submit(self.add_files_to_project_bulk, project_uuid,
+                                add_items[i:i + self.BULK_CHUNK_SIZE]):
+                    add_items[i:i + self.BULK_CHUNK_SIZE]
+                for i in range(0, len(add_items), self.BULK_CHUNK_SIZE)
+            }
+            total = len(futures) + len(add_items)
+            verbose = total <= 200
+            failed = []
+            with _progress_bar(total, "Updating files") as pbar:
+                for future in as_completed(futures):
+                    relative_path = futures[future]
+                    try:
+                        if future.result() is None:
+                            pbar.write(f"Skipped binary file {relative_path}")
+                        elif verbose:
+                            pbar.write(f"Updated {relative_path}")
+                    except Exception as e:
+                        pbar.write(f"Failed to update {relative_path}: {e}")
+                        failed.append(relative_path)
+                    pbar.update(1)
+                for future in as_completed(add_futures):
+                    chunk = add_futures[future]
+                    try:
+                        future.result()
+                        if verbose:
+                            for relative_path, _ in chunk:
+                                pbar.write(f"Added {relative_path}")
+                    except Exception as e:
+                        pbar.write(f"Failed to add chunk of {len(chunk)} files: {e}")
+                        failed.extend(relative_path for relative_path, _ in chunk)
+                    pbar.update(len(chunk))
+
+        if failed:
+            # Failed files must not be recorded as synced, or the next run
+            # would see "no changes" and never retry them.
+            for relative_path in failed:
+                current_files.pop(relative_path, None)
+            print(f"{len(failed)} file(s) failed to upload; "
+                  f"run 'claude-pyrojects update' again to retry them.")
+
+        structure_content = self.generate_file_structure(directory_path, *ignore_rules)
+        structure_hash = hash_text(structure_content)
+        if structure_hash != tracker.manifest.get('structure_hash'):
+            self.update_file_in_project(project_uuid, "PROJECT_STRUCTURE.txt", structure_content, remote_map)
+            print("Updated PROJECT_STRUCTURE.txt")
+        self.last_structure_hash = structure_hash
+
+        tracker.update_manifest(current_files, structure_hash)
+        return changes
+
+    def reinitialize_project_files(self, project_uuid, directory_path, config_manager,
+                                   files_to_upload=None):
         files = self.list_files_in_project(project_uuid)
         file_uuids = [file['uuid'] for file in files]
+        self._remote_file_cache.pop(project_uuid, None)
 
-        for file_uuid in file_uuids:
-            self.delete_file_from_project(project_uuid, file_uuid)
+        uuid_chunks = [file_uuids[i:i + self.BULK_CHUNK_SIZE]
+                       for i in range(0, len(file_uuids), self.BULK_CHUNK_SIZE)]
+        with ThreadPoolExecutor(max_workers=self.upload_concurrency) as executor:
+            futures = [
+                executor.submit(self.delete_files_bulk, project_uuid, chunk)
+                for chunk in uuid_chunks
+            ]
+            for future in as_completed(futures):
+                future.result()
 
-        self.upload_directory_with_structure(project_uuid, directory_path, exclude_extensions)
+        return self.upload_directory_with_structure(project_uuid, directory_path, config_manager,
+                                                    files_to_upload)
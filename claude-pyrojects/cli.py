@@ -1,8 +1,18 @@
 import click
 import os
-import requests.exceptions
-from .api import ClaudeAPI
 from .config import ConfigManager
+from .tracker import FileChangeTracker
+
+
+def get_directory_stats(current_files):
+    """File count and byte total derived from an existing tracker scan, so
+    the stats don't cost an extra walk."""
+    return len(current_files), sum(metadata[0] for metadata in current_files.values())
+
+
+def _upload_list(directory_path, current_files):
+    return [(os.path.join(directory_path, relative_path), relative_path)
+            for relative_path in current_files]
 
 
 @click.group()
@@ -20,34 +30,51 @@ def init(session_key):
     config.initialize_ignore_file()
 
     # Save the session key in claude_pyrojects.key file
-    with open('claude_pyrojects.key', 'w') as key_file:
+    with open(config.key_file, 'w') as key_file:
         key_file.write(session_key)
-        click.echo("Session key saved in 'claude_pyrojects.key'.")
+        click.echo(f"Session key saved in '{config.key_file}'.")
 
     click.echo("Initialization complete. Ignore file and session key saved.")
 
 
 @main.command()
 @click.option('-N', '--project-name', required=True, help='Name of the new project.')
-def create(project_name):
+@click.option('-J', '--jobs', default=6, show_default=True,
+              help='Number of parallel upload workers.')
+def create(project_name, jobs):
     """Create a new Claude project and upload the project structure."""
-    try:
-        # Load session key from claude_pyrojects.key
-        with open('claude_pyrojects.key', 'r') as key_file:
-            session_key = key_file.read().strip()
+    # Imported here so init/status don't pay for curl_cffi and tqdm startup.
+    import requests.exceptions
+    from .api import ClaudeAPI
 
-        api = ClaudeAPI(session_key)
+    try:
         config = ConfigManager()
+        api = ClaudeAPI(config.get_session_key(), upload_concurrency=jobs)
 
         project = api.create_project(api.organization_id, project_name)
         config.save_config(api.organization_id, project['uuid'], project['name'])
         click.echo(f"Project '{project_name}' created with UUID: {project['uuid']}")
 
         directory_path = os.getcwd()  # Assuming the current directory is the project directory
-        api.upload_directory_with_structure(project['uuid'], directory_path, config)
-        click.echo("Project structure and files uploaded successfully.")
+        tracker = FileChangeTracker()
+        current_files = tracker.scan_directory(directory_path, *config.load_ignore_rules())
+        total_files, total_size = get_directory_stats(current_files)
+        click.echo(f"Uploading {total_files} files ({total_size / (1 << 20):.1f} MB)...")
+        failed = api.upload_directory_with_structure(project['uuid'], directory_path, config,
+                                                     _upload_list(directory_path, current_files))
+
+        for relative_path in failed:
+            current_files.pop(relative_path, None)
+        tracker.update_manifest(current_files, api.last_structure_hash)
+        if failed:
+            click.echo(f"{len(failed)} file(s) failed to upload; "
+                       "run 'claude-pyrojects update' to retry them.")
+        else:
+            click.echo("Project structure and files uploaded successfully.")
     except FileNotFoundError:
         click.echo("Session key not found. Please run 'claude-pyrojects init' first.")
+    except ValueError as e:
+        click.echo(str(e))
     except requests.exceptions.RequestException as e:
         click.echo(f"Failed to create project: {e}")
 
@@ -55,21 +82,32 @@ def create(project_name):
 @main.command()
 @click.option('-D', '--directory-path', default=os.getcwd(), type=click.Path(exists=True),
               help='Path to the project directory to update. Defaults to the current directory.')
-def update(directory_path):
-    """Update the project by clearing all files and re-uploading the directory."""
-    try:
-        # Load session key from claude_pyrojects.key
-        with open('claude_pyrojects.key', 'r') as key_file:
-            session_key = key_file.read().strip()
+@click.option('--full', is_flag=True,
+              help='Clear all remote files and re-upload everything instead of syncing changes.')
+@click.option('-J', '--jobs', default=6, show_default=True,
+              help='Number of parallel upload workers.')
+def update(directory_path, full, jobs):
+    """Update the project, uploading only the files that changed."""
+    from .api import ClaudeAPI
 
-        api = ClaudeAPI(session_key)
+    try:
         config = ConfigManager()
+        api = ClaudeAPI(config.get_session_key(), upload_concurrency=jobs)
         project_config = config.load_config()
 
         if project_config:
             project_uuid = project_config['project_uuid']
-
-            api.reinitialize_project_files(project_uuid, directory_path, config)
+            tracker = FileChangeTracker()
+
+            if full or tracker.manifest.get('last_sync') is None:
+                current_files = tracker.scan_directory(directory_path, *config.load_ignore_rules())
+                failed = api.reinitialize_project_files(project_uuid, directory_path, config,
+                                                        _upload_list(directory_path, current_files))
+                for relative_path in failed:
+                    current_files.pop(relative_path, None)
+                tracker.update_manifest(current_files, api.last_structure_hash)
+            else:
+                api.incremental_update_project(project_uuid, directory_path, config, tracker)
             click.echo("Project updated successfully.")
         else:
             click.echo("Project not initialized. Please run 'claude-pyrojects create' first.")
@@ -79,5 +117,32 @@ def update(directory_path):
         click.echo(f"Failed to update project: {e}")
 
 
+@main.command()
+@click.option('-D', '--directory-path', default=os.getcwd(), type=click.Path(exists=True),
+              help='Path to the project directory to check. Defaults to the current directory.')
+def status(directory_path):
+    """Show files added, modified or deleted since the last sync."""
+    config = ConfigManager()
+    tracker = FileChangeTracker()
+
+    current_files = tracker.scan_directory(directory_path, *config.load_ignore_rules())
+    changes = tracker.get_changes(current_files)
+
+    last_sync = tracker.manifest.get('last_sync')
+    if last_sync:
+        click.echo(f"Last sync: {last_sync}")
+
+    if not any(changes.values()):
+        click.echo("No changes since last sync.")
+        return
+
+    # Build the report once and emit it with a single echo: one write()
+    # instead of one per path.
+    lines = []
+    for category in ('added', 'modified', 'deleted'):
+        lines.extend(f"{category}: {relative_path}" for relative_path in changes[category])
+    click.echo("\n".join(lines))
+
+
 if __name__ == '__main__':
     main()
@@ -1,11 +1,32 @@
 import os
+import ast
 import json
 
 
 class ConfigManager:
-    def __init__(self, config_file='claude_pyrojects.config', ignore_file='claude_pyrojects.ignore'):
+    def __init__(self, config_file='claude_pyrojects.config', ignore_file='claude_pyrojects.ignore',
+                 key_file='claude_pyrojects.key'):
         self.config_file = config_file
         self.ignore_file = ignore_file
+        self.key_file = key_file
+        self._ignore_cache = None
+        self._ignore_mtime = None
+        self._key_cache = None
+        self._key_mtime = None
+
+    def get_session_key(self):
+        """Session key from the key file, cached on the instance and
+        re-read only when the file changes."""
+        mtime = os.stat(self.key_file).st_mtime
+        if self._key_cache is not None and self._key_mtime == mtime:
+            return self._key_cache
+        with open(self.key_file, 'r') as f:
+            session_key = f.read().strip()
+        if not session_key:
+            raise ValueError(f"{self.key_file} is empty; run 'claude-pyrojects init' again.")
+        self._key_cache = session_key
+        self._key_mtime = mtime
+        return session_key
 
     def save_config(self, org_uuid, project_uuid, project_name):
         config = {
@@ -17,31 +38,57 @@ class ConfigManager:
             json.dump(config, f)
 
     def load_config(self):
-        if os.path.exists(self.config_file):
+        try:
             with open(self.config_file, 'r') as f:
                 return json.load(f)
-        else:
+        except FileNotFoundError:
             return None
 
     def initialize_ignore_file(self):
-        if not os.path.exists(self.ignore_file):
-            default_content = ('ignore_folders=[".venv", ".idea", ".vscode"]\n'
-                               'ignore_file_extensions=["pdf", "jpg", "png", "pyc"]\n'
-                               'ignore_name_includes=["claude_pyrojects", ".DS_Store"]')
-            with open(self.ignore_file, 'w') as f:
+        default_content = ('ignore_folders=[".venv", ".idea", ".vscode"]\n'
+                           'ignore_file_extensions=["pdf", "jpg", "png", "pyc"]\n'
+                           'ignore_name_includes=["claude_pyrojects", ".DS_Store"]')
+        try:
+            with open(self.ignore_file, 'x') as f:
                 f.write(default_content)
             print(f"{self.ignore_file} created with default values.")
-        else:
+        except FileExistsError:
             print(f"{self.ignore_file} already exists.")
 
     def load_ignore_rules(self):
-        if os.path.exists(self.ignore_file):
-            with open(self.ignore_file, 'r') as f:
-                ignore_rules = {}
-                exec(f.read(), {}, ignore_rules)
-                return (
-                    ignore_rules.get("ignore_folders", []),
-                    ignore_rules.get("ignore_file_extensions", []),
-                    ignore_rules.get("ignore_name_includes", [])
-                )
-        return [], [], []
+        try:
+            mtime = os.stat(self.ignore_file).st_mtime
+        except OSError:
+            return [], [], []
+
+        # The CLI asks for the rules several times per command; re-parse only
+        # when the ignore file actually changed.
+        if self._ignore_cache is not None and self._ignore_mtime == mtime:
+            return self._ignore_cache
+
+        ignore_rules = {}
+        with open(self.ignore_file, 'r') as f:
+            source = f.read()
+        try:
+            tree = ast.parse(source)
+        except SyntaxError:
+            print(f"Could not parse {self.ignore_file}; ignoring its rules.")
+            tree = None
+        if tree is not None:
+            # literal_eval on each assignment's value node: no code execution
+            # like the old exec() parser, but multi-line lists still work.
+            for node in tree.body:
+                if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                        and isinstance(node.targets[0], ast.Name)):
+                    key = node.targets[0].id
+                    try:
+                        ignore_rules[key] = ast.literal_eval(node.value)
+                    except ValueError:
+                        print(f"Ignoring non-literal value for {key} in {self.ignore_file}")
+        self._ignore_cache = (
+            ignore_rules.get("ignore_folders", []),
+            ignore_rules.get("ignore_file_extensions", []),
+            ignore_rules.get("ignore_name_includes", [])
+        )
+        self._ignore_mtime = mtime
+        return self._ignore_cache
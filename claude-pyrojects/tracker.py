@@ -0,0 +1,251 @@
+import os
+import re
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import xxhash
+from datetime import datetime
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+class _SubstringMatcher:
+    """Single-pass multi-substring search via an Aho-Corasick automaton,
+    exposing the same .search() truthiness as a compiled regex."""
+
+    __slots__ = ('_automaton',)
+
+    def __init__(self, substrings):
+        self._automaton = ahocorasick.Automaton()
+        for substring in substrings:
+            self._automaton.add_word(substring, substring)
+        self._automaton.make_automaton()
+
+    def search(self, name):
+        return next(self._automaton.iter(name), None)
+
+
+def _compile_ignore_rules(ignore_folders, ignore_extensions, ignore_name_includes):
+    folder_set = frozenset(ignore_folders)
+    # Normalize to a dotted suffix so "pyc" means "*.pyc" and can't match
+    # an unrelated name that merely ends with those letters.
+    ext_tuple = tuple('.' + ext.lstrip('.') for ext in ignore_extensions)
+    if not ignore_name_includes:
+        name_pattern = None
+    elif ahocorasick is not None and len(ignore_name_includes) > 4:
+        name_pattern = _SubstringMatcher(ignore_name_includes)
+    else:
+        name_pattern = re.compile('|'.join(map(re.escape, ignore_name_includes)))
+    return folder_set, ext_tuple, name_pattern
+
+
+def hash_text(text):
+    return xxhash.xxh3_64(text.encode('utf-8')).hexdigest()
+
+
+def iter_project_files(directory_path, ignore_folders, ignore_extensions, ignore_name_includes):
+    """Yield (file_path, relative_path, stat_result) for every project file
+    that passes the ignore rules, walking with os.scandir so each entry
+    costs a single syscall."""
+    folder_set, ext_tuple, name_pattern = _compile_ignore_rules(
+        ignore_folders, ignore_extensions, ignore_name_includes)
+
+    def _scan(dir_path, rel_prefix):
+        try:
+            with os.scandir(dir_path) as entries:
+                entries = list(entries)
+        except OSError:
+            # Unreadable or vanished directory: skip it, matching os.walk's
+            # default onerror=None behaviour.
+            return
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in folder_set:
+                        yield from _scan(entry.path, rel_prefix + entry.name + os.sep)
+                elif entry.is_file(follow_symlinks=False):
+                    name = entry.name
+                    if ext_tuple and name.endswith(ext_tuple):
+                        continue
+                    if name_pattern and name_pattern.search(name):
+                        continue
+                    # The walk descends from directory_path, so the relative
+                    # path is just the accumulated prefix — no relpath call.
+                    yield entry.path, rel_prefix + name, entry.stat()
+            except OSError:
+                continue
+
+    yield from _scan(directory_path, '')
+
+
+class FileChangeTracker:
+    HASH_ALGO = 'xxh3_64'
+    HASH_BLOCK_SIZE = 1 << 20
+    # Manifest format: files map relative_path -> [size, mtime, hash].
+    MANIFEST_VERSION = 2
+    # With keep_contents, files up to this size keep their bytes from the
+    # scan so the upload phase doesn't read them from disk a second time.
+    CONTENT_CACHE_MAX_FILE = 4 << 20
+
+    def __init__(self, manifest_file='claude_pyrojects.manifest'):
+        self.manifest_file = manifest_file
+        self.manifest = self.load_manifest()
+        self.last_scan_contents = {}
+        self._keep_contents = False
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_file, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return {'version': self.MANIFEST_VERSION, 'hash_algo': self.HASH_ALGO,
+                    'files': {}, 'last_sync': None}
+        manifest = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        if manifest.get('version') != self.MANIFEST_VERSION:
+            # v1 stored a dict per file; repack into the tuple form.
+            manifest['files'] = {
+                path: [entry['size'], entry['mtime'], entry['hash']]
+                for path, entry in manifest.get('files', {}).items()
+                if isinstance(entry, dict) and 'size' in entry
+            }
+            manifest['version'] = self.MANIFEST_VERSION
+        return manifest
+
+    def save_manifest(self):
+        if orjson is not None:
+            data = orjson.dumps(self.manifest)
+        else:
+            data = json.dumps(self.manifest, separators=(',', ':')).encode('utf-8')
+        # Write to a sibling temp file and rename so a crash mid-write can't
+        # leave a torn manifest behind.
+        tmp_file = self.manifest_file + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_file, self.manifest_file)
+
+    def calculate_file_hash(self, file_path):
+        # buffering=0: we feed the hash in HASH_BLOCK_SIZE chunks ourselves,
+        # so the io module's own buffer would only add a copy.
+        with open(file_path, 'rb', buffering=0) as f:
+            if hasattr(hashlib, 'file_digest'):  # Python 3.11+: C read loop
+                return hashlib.file_digest(f, xxhash.xxh3_64).hexdigest()
+            h = xxhash.xxh3_64()
+            buf = bytearray(self.HASH_BLOCK_SIZE)
+            view = memoryview(buf)
+            while True:
+                n = f.readinto(view)
+                if not n:
+                    break
+                h.update(view[:n])
+            return h.hexdigest()
+
+    def get_file_metadata(self, file_path, st=None):
+        if st is None:
+            st = os.stat(file_path)
+        return [st.st_size, st.st_mtime, self.calculate_file_hash(file_path)]
+
+    def scan_directory(self, directory_path, ignore_folders, ignore_extensions, ignore_name_includes,
+                       keep_contents=False):
+        """Scan the tree and return {relative_path: [size, mtime, hash]}.
+
+        With keep_contents, changed files up to CONTENT_CACHE_MAX_FILE also
+        land in last_scan_contents for an upload phase to reuse; callers that
+        don't upload (status, full re-uploads) leave it off so the scan
+        doesn't hold file bytes in memory for nothing."""
+        previous_files = self.manifest.get('files', {})
+        if self.manifest.get('hash_algo') != self.HASH_ALGO:
+            previous_files = {}
+
+        current_files = {}
+        to_hash = []
+        self.last_scan_contents = {}
+        self._keep_contents = keep_contents
+        for file_path, relative_path, st in iter_project_files(
+                directory_path, ignore_folders, ignore_extensions, ignore_name_includes):
+            previous = previous_files.get(relative_path)
+            if previous and previous[0] == st.st_size and previous[1] == st.st_mtime:
+                # Unchanged by (size, mtime): reuse the stored hash without
+                # reading the file.
+                current_files[relative_path] = [st.st_size, st.st_mtime, previous[2]]
+            else:
+                to_hash.append((file_path, relative_path, st, previous))
+
+        if to_hash:
+            # Hashing independent files parallelizes well: xxhash releases
+            # the GIL around its C loop, so threads overlap reads and CPU.
+            with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 4) * 4)) as executor:
+                for result in executor.map(self._hash_one, to_hash):
+                    if result is None:
+                        continue
+                    relative_path, metadata, raw = result
+                    current_files[relative_path] = metadata
+                    if raw is not None:
+                        self.last_scan_contents[relative_path] = raw
+        return current_files
+
+    def _hash_one(self, job):
+        """Hash one scanned file; small changed files also return their raw
+        bytes so the upload phase can skip a second disk read."""
+        file_path, relative_path, st, previous = job
+        try:
+            if self._keep_contents and st.st_size <= self.CONTENT_CACHE_MAX_FILE:
+                with open(file_path, 'rb') as f:
+                    raw = f.read()
+                file_hash = xxhash.xxh3_64(raw).hexdigest()
+                if previous is not None and previous[2] == file_hash:
+                    raw = None  # content unchanged, nothing to upload
+            else:
+                raw = None
+                file_hash = self.calculate_file_hash(file_path)
+        except OSError:
+            # File vanished (or became unreadable) between the scan and the
+            # hash; drop it from this scan and let the next run pick it up.
+            return None
+        return relative_path, [st.st_size, st.st_mtime, file_hash], raw
+
+    def get_changes(self, current_files):
+        previous_files = self.manifest.get('files', {})
+        if self.manifest.get('hash_algo') != self.HASH_ALGO:
+            # Manifest was written with a different hash; every stored hash is
+            # stale, so treat everything present as modified for one sync.
+            previous_files = {}
+
+        changes = {'added': [], 'modified': [], 'deleted': []}
+        for relative_path, metadata in current_files.items():
+            previous = previous_files.get(relative_path)
+            if previous is None:
+                changes['added'].append(relative_path)
+            elif previous[2] != metadata[2]:
+                changes['modified'].append(relative_path)
+
+        for relative_path in previous_files:
+            if relative_path not in current_files:
+                changes['deleted'].append(relative_path)
+
+        return changes
+
+    def update_manifest(self, current_files, structure_hash=None):
+        # If nothing actually changed since the last write, skip the disk
+        # write entirely (and keep the old last_sync, which still reflects
+        # the last time the remote side was touched).
+        if (self.manifest.get('version') == self.MANIFEST_VERSION
+                and self.manifest.get('hash_algo') == self.HASH_ALGO
+                and self.manifest.get('files') == current_files
+                and self.manifest.get('structure_hash') == structure_hash):
+            return
+        self.manifest = {
+            'version': self.MANIFEST_VERSION,
+            'hash_algo': self.HASH_ALGO,
+            'files': current_files,
+            'structure_hash': structure_hash,
+            'last_sync': datetime.now().isoformat(),
+        }
+        self.save_manifest()
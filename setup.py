@@ -15,6 +15,8 @@ setup(
         'requests',
         'curl_cffi',
         'tzlocal',
+        'tqdm',
+        'xxhash',
     ],
     entry_points={
         'console_scripts': [